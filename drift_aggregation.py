@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+from funciones_drift import WEIGHT_COL
+
+# columnas de momentos por bucket que agrega `quantile_summary`
+SUMMARY_STATS = ("mean", "m2", "min", "max")
+
+
+# ============================================================
+#  Pre-agregación: resúmenes de cuantiles ponderados por bucket
+# ============================================================
+
+def check_bucket(bucket: str, window: str) -> None:
+    """
+    Valida que el bucket de pre-agregación sea positivo, no mayor que la
+    ventana y la divida exactamente (si no, los buckets cruzarían bordes de
+    ventana).
+    """
+    bucket_td = pd.to_timedelta(bucket)
+    window_td = pd.to_timedelta(window)
+    if bucket_td <= pd.Timedelta(0) or bucket_td > window_td or window_td % bucket_td:
+        raise ValueError(
+            f"pre_aggregate={bucket!r} debe ser positivo, no mayor que "
+            f"window={window!r} y dividirlo exactamente."
+        )
+
+
+def quantile_summary(
+    series: pd.Series,
+    bucket: str = "1min",
+    n_quantiles: int = 16,
+) -> pd.DataFrame:
+    """
+    Colapsa una serie de alta frecuencia en resúmenes por bucket temporal.
+
+    Cada bucket con `n` observaciones crudas se reemplaza por:
+      - sus `n` valores con peso 1, si `n <= n_quantiles` (exacto), o
+      - `n_quantiles` cuantiles en probabilidades (i + 0.5) / n_quantiles,
+        cada uno con peso `n / n_quantiles`.
+
+    Retorna un DataFrame indexado por el FIN del bucket (inicio del bucket
+    más su largo menos 1µs, el mismo corte que usa el historial en
+    pipeline_drift): así una ventana cerrada en `t_end` solo incluye buckets
+    cuyos datos son todos anteriores a `t_end` (sin look-ahead). Columnas:
+      - `value`, `weight`: la muestra ponderada. La suma de `weight` por
+        bucket es siempre `n`, por lo que los conteos (ej: `min_points`)
+        siguen midiendo observaciones crudas.
+      - `mean`, `min`, `max`: media, mínimo y máximo exactos del bucket
+        (repetidos en cada una de sus filas).
+      - `m2`: suma de cuadrados centrada del bucket, repartida en partes
+        iguales entre sus filas.
+    Con estas columnas `summary_std` y `summary_range` reconstruyen la
+    desviación estándar y el rango exactos de cualquier conjunto de buckets
+    completos (los cuantiles solos recortan las colas de cada bucket).
+    """
+    if n_quantiles < 1:
+        raise ValueError("n_quantiles debe ser >= 1.")
+
+    s = pd.to_numeric(series, errors="coerce").dropna()
+    if s.empty:
+        empty = pd.DataFrame(
+            {c: pd.Series(dtype=float) for c in ("value", WEIGHT_COL, *SUMMARY_STATS)}
+        )
+        empty.index = pd.DatetimeIndex([], name=series.index.name)
+        return empty
+
+    floored = s.index.floor(bucket)
+    bucket_end = floored + (pd.to_timedelta(bucket) - pd.Timedelta(microseconds=1))
+    keys = bucket_end.asi8
+    vals = s.to_numpy(dtype=float)
+    order = np.lexsort((vals, keys))
+    keys, vals = keys[order], vals[order]
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, vals.size])
+    small = counts <= n_quantiles
+
+    # momentos exactos por bucket (valores ya ordenados dentro de cada bucket)
+    b_mean = np.add.reduceat(vals, starts) / counts
+    b_m2 = np.add.reduceat((vals - np.repeat(b_mean, counts)) ** 2, starts)
+    b_min = vals[starts]
+    b_max = vals[starts + counts - 1]
+    rows_per_bucket = np.where(small, counts, n_quantiles)
+    b_stats = {
+        "mean": b_mean,
+        "m2": b_m2 / rows_per_bucket,
+        "min": b_min,
+        "max": b_max,
+    }
+
+    # buckets chicos: valores crudos, peso 1
+    raw_mask = np.repeat(small, counts)
+    raw_keys = keys[raw_mask]
+    raw_vals = vals[raw_mask]
+    raw_w = np.ones(raw_vals.size)
+
+    # buckets grandes: cuantiles por interpolación lineal sobre los valores ordenados
+    n_big = counts[~small]
+    s_big = starts[~small]
+    probs = (np.arange(n_quantiles) + 0.5) / n_quantiles
+    pos = probs[None, :] * n_big[:, None] - 0.5
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, n_big[:, None] - 1)
+    frac = pos - lo
+    q_vals = (
+        vals[s_big[:, None] + lo] * (1.0 - frac)
+        + vals[s_big[:, None] + hi] * frac
+    ).ravel()
+    q_keys = np.repeat(keys[s_big], n_quantiles)
+    q_w = np.repeat(n_big / n_quantiles, n_quantiles)
+
+    stats = {
+        c: np.concatenate([np.repeat(v[small], counts[small]), np.repeat(v[~small], n_quantiles)])
+        for c, v in b_stats.items()
+    }
+
+    all_keys = np.concatenate([raw_keys, q_keys])
+    order = np.argsort(all_keys, kind="mergesort")
+    # asi8 está en la unidad (y UTC, si hay zona horaria) del índice original
+    index = pd.DatetimeIndex(all_keys[order].view(f"M8[{bucket_end.unit}]"), name=series.index.name)
+    if bucket_end.tz is not None:
+        index = index.tz_localize("UTC").tz_convert(bucket_end.tz)
+    return pd.DataFrame(
+        {
+            "value": np.concatenate([raw_vals, q_vals])[order],
+            WEIGHT_COL: np.concatenate([raw_w, q_w])[order],
+            **{c: v[order] for c, v in stats.items()},
+        },
+        index=index,
+    )
+
+
+def summary_std(summary: pd.DataFrame) -> float:
+    """
+    Desviación estándar (ddof=1) de las observaciones crudas detrás de un
+    resumen de `quantile_summary`, combinando los momentos de cada bucket
+    (exacta si el resumen contiene buckets completos). NaN si n <= 1.
+    """
+    w = summary[WEIGHT_COL].to_numpy(dtype=float)
+    n = w.sum()
+    if n <= 1:
+        return float("nan")
+    means = summary["mean"].to_numpy(dtype=float)
+    mean = np.sum(w * means) / n
+    m2 = summary["m2"].sum() + np.sum(w * (means - mean) ** 2)
+    return float(np.sqrt(m2 / (n - 1)))
+
+
+def summary_range(summary: pd.DataFrame) -> tuple[float, float]:
+    """Mínimo y máximo de las observaciones crudas detrás de un resumen."""
+    return float(summary["min"].min()), float(summary["max"].max())
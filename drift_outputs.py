@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+import pandas as pd
+
+
+# ============================================================
+#  Escritura asíncrona
+# ============================================================
+
+_STOP = object()
+
+
+class AsyncOutputWriter:
+    """
+    Escritor en segundo plano (un hilo + cola acotada).
+
+    `submit(fn, *args, **kwargs)` encola la escritura y retorna de inmediato,
+    de modo que la serialización de una variable se solapa con el cálculo de
+    la siguiente. `max_pending` limita cuántos resultados quedan en memoria
+    esperando disco. Los errores del hilo se relanzan en `close()`.
+
+    `busy_seconds` es el tiempo que el hilo pasó escribiendo y `wait_seconds`
+    el tiempo que el hilo principal quedó bloqueado esperándolo (cola llena o
+    `close()`). `wait_seconds` bajo no implica ganancia: `to_csv` retiene el
+    GIL buena parte del tiempo, así que con una sola CPU ambos hilos compiten
+    y el tiempo total es similar al de escribir en forma sincrónica.
+
+    Solo para escrituras CSV: el store Parquet (pyarrow) se escribe en el hilo
+    principal.
+    """
+
+    def __init__(self, max_pending: int = 4) -> None:
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._errors: List[BaseException] = []
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        # no-daemon: el intérprete nunca termina con una escritura a medias
+        self._thread = threading.Thread(target=self._worker, name="drift-output-writer")
+        self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                fn, args, kwargs = task
+                if not self._errors:
+                    t = time.perf_counter()
+                    fn(*args, **kwargs)
+                    self.busy_seconds += time.perf_counter() - t
+            except BaseException as exc:  # se relanza en close()
+                self._errors.append(exc)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        if self._errors:
+            raise self._errors[0]
+        t = time.perf_counter()
+        self._queue.put((fn, args, kwargs))
+        self.wait_seconds += time.perf_counter() - t
+
+    def close(self) -> None:
+        t = time.perf_counter()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self.wait_seconds += time.perf_counter() - t
+        if self._errors:
+            raise self._errors[0]
+
+    def __enter__(self) -> "AsyncOutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # ya hay una excepción en curso: drenamos sin tapar el error original
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+# ============================================================
+#  Store consolidado (Parquet particionado)
+# ============================================================
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_partitioned(df: pd.DataFrame, root: Path, name: str, time_col: str) -> None:
+    """
+    Agrega `df` al dataset Parquet `root`, particionado como
+    `variable=<name>/date=<YYYY-MM-DD>/` según `time_col`.
+    """
+    if df.empty:
+        return
+    out = df.copy()
+    # columnas completamente nulas (ej: stat_value sin ventanas evaluadas)
+    # se fijan a float para que el esquema coincida entre particiones
+    for col in out.columns:
+        if out[col].dtype == object and out[col].isna().all():
+            out[col] = out[col].astype(float)
+    # strftime solo sobre los días distintos, no fila a fila
+    codes, days = pd.factorize(pd.to_datetime(out[time_col]).dt.normalize())
+    out["date"] = pd.Categorical.from_codes(codes, categories=days.strftime("%Y-%m-%d"))
+    out["variable"] = name
+    root.mkdir(parents=True, exist_ok=True)
+    out.to_parquet(root, partition_cols=["variable", "date"], index=False)
+
+
+EPISODE_COLUMNS = ["variable", "episode_id", "t_start", "t_end", "n_windows", "max_stat", "mean_stat"]
+
+
+def summarize_episodes(windows_df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    Un registro por episodio de drift: inicio/fin, número de ventanas y
+    valor máximo/medio de la métrica.
+    """
+    if windows_df.empty or "episode_id" not in windows_df.columns:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    drift = windows_df.dropna(subset=["episode_id"])
+    if drift.empty:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    stat = pd.to_numeric(drift["stat_value"], errors="coerce")
+    summary = (
+        drift.assign(stat_value=stat)
+        .groupby("episode_id")
+        .agg(
+            t_start=("t0", "min"),
+            t_end=("t1", "max"),
+            n_windows=("t0", "size"),
+            max_stat=("stat_value", "max"),
+            mean_stat=("stat_value", "mean"),
+        )
+        .reset_index()
+    )
+    summary["episode_id"] = summary["episode_id"].astype(int)
+    summary.insert(0, "variable", name)
+    return summary[EPISODE_COLUMNS]
+
+
+def write_episodes(episodes: List[pd.DataFrame], path: Path) -> None:
+    frames = [e for e in episodes if not e.empty]
+    out = (
+        pd.concat(frames, ignore_index=True)
+        if frames
+        else pd.DataFrame(columns=EPISODE_COLUMNS)
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out.to_parquet(path, index=False)
@@ -9,6 +9,7 @@ class DriftThresholdConfig:
     psi: float = 0.25               # umbral fijo para PSI
     ks: float = 0.15                # umbral fijo para KS
     wasserstein_factor: float = 0.6 # umbral = factor * std(ref)
+    mmd: float = 0.2                # umbral fijo para MMD (datos estandarizados)
 
     # Fallbacks
     min_fallback: float = 0.25
@@ -19,7 +20,10 @@ def effective_threshold(
     ref_series: pd.Series,
     cfg: DriftThresholdConfig,
     thr_override: float | None,
+    ref_std: float | None = None,
 ) -> float:
+    # `ref_std`: desviación estándar de la referencia ya calculada (ej: con los
+    # momentos exactos de un resumen pre-agregado); si es None, se usa ref_series.
 
     method = str(method).lower()
 
@@ -32,8 +36,12 @@ def effective_threshold(
     if method == "ks":
         return float(cfg.ks)
 
+    if method == "mmd":
+        return float(cfg.mmd)
+
     if method == "wasserstein":
-        ref_std = pd.to_numeric(ref_series, errors="coerce").dropna().std()
+        if ref_std is None:
+            ref_std = pd.to_numeric(ref_series, errors="coerce").dropna().std()
         if pd.isna(ref_std) or ref_std <= 0:
             return float(cfg.fallback_std)
         return float(ref_std * cfg.wasserstein_factor)
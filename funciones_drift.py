@@ -1,43 +1,203 @@
 from __future__ import annotations
+from functools import lru_cache
+from typing import Sequence
 import numpy as np
 import pandas as pd
-from scipy.stats import ks_2samp, wasserstein_distance
+# ============================================================
+#  Backends para KS y Wasserstein
+#    - 'scipy': scipy.stats (import diferido, solo al primer uso)
+#    - 'numpy': implementación propia basada en CDF ordenadas
+#    - 'auto' : scipy si está instalado, si no numpy
+# ============================================================
+
+BACKENDS = ("auto", "scipy", "numpy")
+
+
+@lru_cache(maxsize=None)
+def _scipy_stats():
+    try:
+        from scipy import stats
+    except ImportError:
+        return None
+    return stats
+
+
+def check_backend(backend: str) -> None:
+    """
+    Valida `backend` al construir la config: debe estar en BACKENDS y, si es
+    'scipy', scipy tiene que estar instalado.
+    """
+    _resolve_backend(backend)
+
+
+def _resolve_backend(backend: str) -> str:
+    backend = str(backend).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend!r} (opciones: {', '.join(BACKENDS)}).")
+    if backend == "numpy":
+        return "numpy"
+    if _scipy_stats() is not None:
+        return "scipy"
+    if backend == "scipy":
+        raise ImportError("backend='scipy' requiere scipy instalado (pip install scipy).")
+    return "numpy"
+
+
+# Columna opcional de pesos (filas que resumen varias observaciones crudas,
+# ver drift_aggregation.py). Las métricas aceptan pesos por separado.
+WEIGHT_COL = "weight"
+
+
+def _values_weights(x, w) -> tuple[np.ndarray, np.ndarray]:
+    """Valores numéricos y pesos alineados, sin NaN ni pesos no positivos."""
+    v = np.asarray(pd.to_numeric(x, errors="coerce"), dtype=float)
+    ww = np.ones_like(v) if w is None else np.asarray(w, dtype=float)
+    mask = ~np.isnan(v) & (ww > 0)
+    return v[mask], ww[mask]
+
+
+def _sorted_cdf(x: np.ndarray, w: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Valores ordenados y CDF acumulada (con 0 inicial) para evaluar con searchsorted."""
+    order = np.argsort(x, kind="mergesort")
+    cum = np.concatenate([[0.0], np.cumsum(w[order])])
+    return x[order], cum / cum[-1]
+
+
+def _weighted_quantile(x: np.ndarray, w: np.ndarray, qs: np.ndarray) -> np.ndarray:
+    """
+    Cuantil lineal (mismo criterio que np.quantile) sobre la muestra expandida
+    por pesos de frecuencia: con pesos 1 coincide exactamente con np.quantile,
+    y con pesos enteros con np.quantile de la muestra repetida.
+    """
+    order = np.argsort(x, kind="mergesort")
+    xs, cum = x[order], np.cumsum(w[order])
+    h = qs * (cum[-1] - 1)
+    lo = np.floor(h)
+    t = h - lo
+
+    def at(k: np.ndarray) -> np.ndarray:
+        return xs[np.minimum(np.searchsorted(cum, k, side="right"), xs.size - 1)]
+
+    a, b = at(lo), at(lo + 1)
+    diff = b - a
+    # misma interpolación que numpy (_lerp) para resultados idénticos
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def _ks_statistic_numpy(
+    r: np.ndarray,
+    c: np.ndarray,
+    wr: np.ndarray | None = None,
+    wc: np.ndarray | None = None,
+) -> float:
+    r, cdf_r = _sorted_cdf(r, np.ones_like(r) if wr is None else wr)
+    c, cdf_c = _sorted_cdf(c, np.ones_like(c) if wc is None else wc)
+    grid = np.concatenate([r, c])
+    f_r = cdf_r[np.searchsorted(r, grid, side="right")]
+    f_c = cdf_c[np.searchsorted(c, grid, side="right")]
+    return float(np.max(np.abs(f_r - f_c)))
+
+
+def _wasserstein_numpy(
+    r: np.ndarray,
+    c: np.ndarray,
+    wr: np.ndarray | None = None,
+    wc: np.ndarray | None = None,
+) -> float:
+    r, cdf_r = _sorted_cdf(r, np.ones_like(r) if wr is None else wr)
+    c, cdf_c = _sorted_cdf(c, np.ones_like(c) if wc is None else wc)
+    grid = np.sort(np.concatenate([r, c]))
+    deltas = np.diff(grid)
+    f_r = cdf_r[np.searchsorted(r, grid[:-1], side="right")]
+    f_c = cdf_c[np.searchsorted(c, grid[:-1], side="right")]
+    return float(np.sum(np.abs(f_r - f_c) * deltas))
+
+# ============================================================
+#  Métricas: `ref_weights` / `cur_weights` opcionales (None = peso 1)
 # ============================================================
 
 #  KS  (Kolmogorov-Smirnov)
-def ks_numeric(ref, cur) -> float | None:
+def ks_numeric(
+    ref,
+    cur,
+    backend: str = "auto",
+    ref_weights=None,
+    cur_weights=None,
+) -> float | None:
+    if ref_weights is not None or cur_weights is not None:
+        # ks_2samp no acepta pesos: siempre backend NumPy (pero validamos `backend`)
+        _resolve_backend(backend)
+        r, wr = _values_weights(ref, ref_weights)
+        c, wc = _values_weights(cur, cur_weights)
+        if r.size < 5 or c.size < 5:
+            return None
+        return _ks_statistic_numpy(r, c, wr, wc)
+
     r = pd.to_numeric(ref, errors="coerce").dropna()
     c = pd.to_numeric(cur, errors="coerce").dropna()
     if len(r) < 5 or len(c) < 5:
         return None
-    return float(ks_2samp(r, c, alternative="two-sided", mode="auto").statistic)
+    if _resolve_backend(backend) == "numpy":
+        return _ks_statistic_numpy(r.to_numpy(dtype=float), c.to_numpy(dtype=float))
+    return float(_scipy_stats().ks_2samp(r, c, alternative="two-sided", mode="auto").statistic)
 
 # Wasserstein
-def wasserstein_numeric(ref, cur) -> float | None:
+def wasserstein_numeric(
+    ref,
+    cur,
+    backend: str = "auto",
+    ref_weights=None,
+    cur_weights=None,
+) -> float | None:
+    if ref_weights is not None or cur_weights is not None:
+        r, wr = _values_weights(ref, ref_weights)
+        c, wc = _values_weights(cur, cur_weights)
+        if r.size < 5 or c.size < 5:
+            return None
+        if _resolve_backend(backend) == "numpy":
+            return _wasserstein_numpy(r, c, wr, wc)
+        return float(_scipy_stats().wasserstein_distance(r, c, u_weights=wr, v_weights=wc))
+
     r = pd.to_numeric(ref, errors="coerce").dropna()
     c = pd.to_numeric(cur, errors="coerce").dropna()
     if len(r) < 5 or len(c) < 5:
         return None
-    return float(wasserstein_distance(r, c))
+    if _resolve_backend(backend) == "numpy":
+        return _wasserstein_numpy(r.to_numpy(dtype=float), c.to_numpy(dtype=float))
+    return float(_scipy_stats().wasserstein_distance(r, c))
 
 #  PSI  (Population Stability Index)
-def psi_numeric(ref, cur, n_bins: int = 10) -> float | None:
-    r = pd.to_numeric(ref, errors="coerce").dropna().to_numpy()
-    c = pd.to_numeric(cur, errors="coerce").dropna().to_numpy()
+def psi_numeric(
+    ref,
+    cur,
+    n_bins: int = 10,
+    ref_weights=None,
+    cur_weights=None,
+    ref_range: tuple[float, float] | None = None,
+) -> float | None:
+    # `ref_range`: (mín, máx) exactos de la referencia para los bordes externos,
+    # cuando `ref` es un resumen cuyos cuantiles no llegan a los extremos
+    r, wr = _values_weights(ref, ref_weights)
+    c, wc = _values_weights(cur, cur_weights)
 
     if r.size < 5 or c.size < 5:
         return None
 
     qs = np.linspace(0.0, 1.0, n_bins + 1)
-    edges = np.quantile(r, qs)
+    if ref_weights is None:
+        edges = np.quantile(r, qs)
+    else:
+        edges = _weighted_quantile(r, wr, qs)
+    if ref_range is not None:
+        edges[0], edges[-1] = ref_range
 
     # Caso degenerado
     edges = np.unique(edges)
     if edges.size < 2:
         return 0.0
 
-    r_bins, edges = np.histogram(r, bins=edges)
-    c_bins, _ = np.histogram(c, bins=edges)
+    r_bins, edges = np.histogram(r, bins=edges, weights=wr)
+    c_bins, _ = np.histogram(c, bins=edges, weights=wc)
 
     eps = 1e-6
     p_r = np.clip(r_bins.astype(float) / r_bins.sum(), eps, 1.0)
@@ -48,7 +208,90 @@ def psi_numeric(ref, cur, n_bins: int = 10) -> float | None:
 
     return float(np.sum((p_c - p_r) * np.log(p_c / p_r)))
 
-def score_numeric_series(a: pd.Series, b: pd.Series, method: str) -> float | None:
+#  MMD  (Maximum Mean Discrepancy, aproximado con Random Fourier Features)
+def _as_matrix(x, weights=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte Series/DataFrame/array a matriz (n, d) float y pesos (n,),
+    sin filas con NaN ni pesos no positivos.
+    """
+    if isinstance(x, pd.Series):
+        x = x.to_frame()
+    if isinstance(x, pd.DataFrame):
+        x = x.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        x = x.reshape(-1, 1)
+    w = np.ones(x.shape[0]) if weights is None else np.asarray(weights, dtype=float)
+    mask = ~np.isnan(x).any(axis=1) & (w > 0)
+    return x[mask], w[mask]
+
+
+def _rff_mean_embedding(
+    x: np.ndarray,
+    weights: np.ndarray,
+    w: np.ndarray,
+    b: np.ndarray,
+    batch_size: int,
+) -> np.ndarray:
+    """Media ponderada de cos(xW + b), acumulada por lotes para acotar memoria."""
+    acc = np.zeros(w.shape[1], dtype=float)
+    for start in range(0, x.shape[0], batch_size):
+        stop = start + batch_size
+        acc += weights[start:stop] @ np.cos(x[start:stop] @ w + b)
+    return acc * np.sqrt(2.0 / w.shape[1]) / weights.sum()
+
+
+def mmd_rff_numeric(
+    ref,
+    cur,
+    n_features: int = 256,
+    seed: int = 0,
+    batch_size: int = 4096,
+    ref_weights=None,
+    cur_weights=None,
+) -> float | None:
+    """
+    MMD con kernel gaussiano aproximado por Random Fourier Features.
+
+    Acepta Series (univariado) o DataFrame (multivariado, una columna por
+    variable). Ambas muestras se estandarizan con media/desviación de la
+    referencia y se usa ancho de banda sqrt(d), por lo que el costo es
+    O((n_ref + n_cur) · d · n_features) en lugar de cuadrático.
+    """
+    r, wr = _as_matrix(ref, ref_weights)
+    c, wc = _as_matrix(cur, cur_weights)
+    if r.shape[0] < 5 or c.shape[0] < 5:
+        return None
+    if r.shape[1] != c.shape[1]:
+        raise ValueError("mmd_rff_numeric: ref y cur deben tener las mismas columnas.")
+
+    mu = np.average(r, axis=0, weights=wr)
+    sd = np.sqrt(np.average((r - mu) ** 2, axis=0, weights=wr))
+    sd[~(sd > 0)] = 1.0
+    r = (r - mu) / sd
+    c = (c - mu) / sd
+
+    d = r.shape[1]
+    bandwidth = np.sqrt(d)
+    rng = np.random.default_rng(seed)
+    w = rng.normal(scale=1.0 / bandwidth, size=(d, n_features))
+    b = rng.uniform(0.0, 2.0 * np.pi, size=n_features)
+
+    diff = (
+        _rff_mean_embedding(r, wr, w, b, batch_size)
+        - _rff_mean_embedding(c, wc, w, b, batch_size)
+    )
+    return float(np.sqrt(np.dot(diff, diff)))
+
+def score_numeric_series(
+    a: pd.Series,
+    b: pd.Series,
+    method: str,
+    backend: str = "auto",
+    a_weights=None,
+    b_weights=None,
+    a_range: tuple[float, float] | None = None,
+) -> float | None:
     """
     Wrapper genérico para métricas numéricas de drift.
 
@@ -56,20 +299,43 @@ def score_numeric_series(a: pd.Series, b: pd.Series, method: str) -> float | Non
       - 'psi'
       - 'ks'
       - 'wasserstein'
+      - 'mmd'
 
     Si la métrica no se reconoce, se usa PSI como fallback.
+    `backend` ('auto', 'scipy', 'numpy') solo aplica a KS y Wasserstein.
+    `a_weights` / `b_weights`: pesos por fila (ej: resúmenes pre-agregados).
+    `a_range`: (mín, máx) exactos de `a`, usados por PSI para los bordes externos.
     """
     method = str(method).lower()
+    weights = {"ref_weights": a_weights, "cur_weights": b_weights}
 
     if method == "psi":
-        return psi_numeric(a, b, n_bins=10)
+        return psi_numeric(a, b, n_bins=10, ref_range=a_range, **weights)
     if method == "ks":
-        return ks_numeric(a, b)
+        return ks_numeric(a, b, backend=backend, **weights)
     if method == "wasserstein":
-        return wasserstein_numeric(a, b)
+        return wasserstein_numeric(a, b, backend=backend, **weights)
+    if method == "mmd":
+        return mmd_rff_numeric(a, b, **weights)
 
     # fallback: PSI
-    return psi_numeric(a, b, n_bins=10)
+    return psi_numeric(a, b, n_bins=10, ref_range=a_range, **weights)
+
+MULTIVARIATE_METHODS = ("mmd",)
+
+def score_multivariate_frame(a: pd.DataFrame, b: pd.DataFrame, method: str) -> float | None:
+    """
+    Wrapper para métricas multivariadas (una columna por variable del grupo).
+
+    Métricas soportadas:
+      - 'mmd'
+    """
+    method = str(method).lower()
+
+    if method == "mmd":
+        return mmd_rff_numeric(a, b)
+
+    raise ValueError(f"Método multivariado desconocido: {method!r} (soportado: 'mmd').")
 # ============================================================
 #  Estrategias de referencias
 # ============================================================
@@ -119,7 +385,9 @@ def ref_seasonal(
 def ref_golden(df_hist: pd.DataFrame,
                win: str = "30min",
                step: str = "10min",
-               k: int = 40) -> pd.DataFrame:
+               k: int = 40,
+               exclude: Sequence[str] = ()) -> pd.DataFrame:
+    # `exclude`: columnas que no son variables (ej: pesos de filas pre-agregadas)
 
     if df_hist.empty:
         return df_hist.iloc[:0]
@@ -142,7 +410,7 @@ def ref_golden(df_hist: pd.DataFrame,
         if len(sub) < 3:
             continue
 
-        num = sub.select_dtypes(include="number")
+        num = sub.select_dtypes(include="number").drop(columns=list(exclude))
         if num.empty:
             continue
 
@@ -5,11 +5,14 @@ from pathlib import Path
 
 DEFAULT_CONFIG = {
     "global": {
-        "method": "wasserstein",     # "psi", "ks" o "wasserstein"
+        "method": "wasserstein",     # "psi", "ks", "wasserstein" o "mmd"
         "strategy": "decay",         # "decay", "golden", "seasonal"
         "window": "12h",             # tamaño de ventana
         "threshold": None,           # umbral explícito (None → usar defaults por métrica)
         "min_points": 60,             # mínimo de puntos por ventana
+        "backend": "auto",           # KS/Wasserstein: "auto", "scipy" o "numpy"
+        "pre_aggregate": None,       # bucket de pre-agregación (ej "1min"); None = crudo
+        "quantile_points": 16,       # cuantiles por bucket al pre-agregar
    },
 }
 
@@ -32,8 +35,8 @@ def main() -> None:
     parser.add_argument(
         "--method",
         type=str,
-        choices=["psi", "ks", "wasserstein"],
-        help="Métrica global a usar (psi, ks o wasserstein). "
+        choices=["psi", "ks", "wasserstein", "mmd"],
+        help="Métrica global a usar (psi, ks, wasserstein o mmd). "
              "Si no se especifica, se usa la del DEFAULT_CONFIG.",
     )
 
@@ -63,6 +66,27 @@ def main() -> None:
         help="Mínimo de puntos por ventana para evaluar drift.",
     )
 
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=["auto", "scipy", "numpy"],
+        help="Backend para KS y Wasserstein (auto: scipy si está instalado, "
+             "si no numpy).",
+    )
+
+    parser.add_argument(
+        "--pre-aggregate",
+        type=str,
+        help="Bucket de pre-agregación para sensores de alta frecuencia "
+             "(ej: '1min'). Si no se entrega, se usan los datos crudos.",
+    )
+
+    parser.add_argument(
+        "--quantile-points",
+        type=int,
+        help="Número de cuantiles por bucket al pre-agregar.",
+    )
+
     parser.add_argument(
         "--hysteresis-windows",
         type=int,
@@ -85,6 +109,12 @@ def main() -> None:
         global_cfg["threshold"] = float(args.threshold)
     if args.min_points is not None:
         global_cfg["min_points"] = int(args.min_points)
+    if args.backend is not None:
+        global_cfg["backend"] = args.backend
+    if args.pre_aggregate is not None:
+        global_cfg["pre_aggregate"] = args.pre_aggregate
+    if args.quantile_points is not None:
+        global_cfg["quantile_points"] = int(args.quantile_points)
     if args.hysteresis_windows is not None:
         global_cfg["hysteresis_windows"] = int(args.hysteresis_windows)
 
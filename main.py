@@ -1,9 +1,8 @@
 import argparse
+import importlib.util
 import sys
 from pathlib import Path
 
-from pipeline_drift import DriftPipeline
-
 
 # ============================================================
 # Chequeo básico de entorno (dependencias)
@@ -13,7 +12,9 @@ def check_environment() -> None:
     """
     Verifica que las dependencias mínimas estén instaladas.
     - numpy, pandas: obligatorios (si faltan → aborta).
-    - scipy: opcional pero recomendado (KS y Wasserstein).
+    - scipy: opcional (KS y Wasserstein usan un backend NumPy si falta).
+
+    No importa el pipeline: así el chequeo corre antes de cargar numpy/pandas.
     """
     required = ["numpy", "pandas"]
     optional = ["scipy"]
@@ -21,16 +22,13 @@ def check_environment() -> None:
     missing_required = []
     missing_optional = []
 
+    # find_spec no ejecuta el módulo: chequear scipy no cuesta su import
     for mod in required:
-        try:
-            __import__(mod)
-        except ImportError:
+        if importlib.util.find_spec(mod) is None:
             missing_required.append(mod)
 
     for mod in optional:
-        try:
-            __import__(mod)
-        except ImportError:
+        if importlib.util.find_spec(mod) is None:
             missing_optional.append(mod)
 
     if not missing_required and not missing_optional:
@@ -47,10 +45,10 @@ def check_environment() -> None:
 
     if "scipy" in missing_optional:
         print("\nℹ️ scipy NO está instalado.")
-        print("   El pipeline seguirá funcionando, pero:")
-        print("   - ks_numeric y wasserstein_numeric devolverán None.")
-        print("   - Solo PSI estará completamente operativo.\n")
-        print("   Para habilitar KS y Wasserstein instala:")
+        print("   El pipeline seguirá funcionando:")
+        print("   - ks_numeric y wasserstein_numeric usarán el backend NumPy")
+        print("     (mismos valores que scipy, implementación propia).\n")
+        print("   Para usar el backend scipy instala:")
         print("   pip install scipy\n")
 
 
@@ -99,17 +97,30 @@ def main() -> None:
         ),
     )
 
+    parser.add_argument(
+        "--results-store",
+        action="store_true",
+        help=(
+            "Además de los CSV, escribe un store Parquet consolidado "
+            "(particionado por variable y fecha, con resumen de episodios). "
+            "Requiere pyarrow."
+        ),
+    )
+
     args = parser.parse_args()
 
     # 1) Chequeo de entorno
     check_environment()
 
-    # 2) Ejecutar pipeline
+    # 2) Ejecutar pipeline (import diferido: --help y el chequeo no cargan pandas)
+    from pipeline_drift import DriftPipeline
+
     pipeline = DriftPipeline(
         input_csv=args.input_csv,
         output_root=args.output_dir,
         config_path=args.config,
         variables=args.columns,
+        results_store=args.results_store,
     )
     pipeline.run()
 
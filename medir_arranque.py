@@ -0,0 +1,107 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+
+# ============================================================
+# Medición de tiempo de arranque (python -X importtime)
+# ============================================================
+
+REPO_DIR = Path(__file__).resolve().parent
+
+# módulo → presupuesto de import acumulado (ms)
+DEFAULT_BUDGETS_MS = {
+    "main": 100.0,
+    "pipeline_drift": 1500.0,
+}
+
+# módulos que NO deben cargarse al importar el pipeline (imports diferidos).
+# pyarrow no se incluye: pandas lo importa por su cuenta si está instalado.
+LAZY_MODULES = ["scipy"]
+
+
+def measure_import(module: str) -> dict:
+    """
+    Importa `module` en un proceso nuevo con `-X importtime` y retorna
+    el tiempo acumulado (ms) y el conjunto de paquetes top-level cargados.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falló 'import {module}':\n{proc.stderr}")
+
+    cumulative_ms = None
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue  # encabezado
+        name = parts[2]
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative_ms = int(parts[1]) / 1000.0
+
+    return {"cumulative_ms": cumulative_ms, "loaded": loaded}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Mide el tiempo de import de main.py y pipeline_drift.py con "
+            "'python -X importtime' y verifica presupuestos."
+        )
+    )
+    parser.add_argument(
+        "--budget-main-ms",
+        type=float,
+        default=DEFAULT_BUDGETS_MS["main"],
+        help="Presupuesto para 'import main' en ms (por defecto: %(default)s).",
+    )
+    parser.add_argument(
+        "--budget-pipeline-ms",
+        type=float,
+        default=DEFAULT_BUDGETS_MS["pipeline_drift"],
+        help="Presupuesto para 'import pipeline_drift' en ms (por defecto: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    budgets = {
+        "main": args.budget_main_ms,
+        "pipeline_drift": args.budget_pipeline_ms,
+    }
+
+    failures = []
+    for module, budget in budgets.items():
+        result = measure_import(module)
+        ms = result["cumulative_ms"]
+        ok = ms is not None and ms <= budget
+        ms_txt = f"{ms:.1f} ms" if ms is not None else "n/a"
+        print(f"{'✅' if ok else '❌'} import {module}: {ms_txt} (presupuesto {budget:.0f} ms)")
+        if ms is None:
+            failures.append(f"import {module} sin medición en la salida de -X importtime")
+        elif not ok:
+            failures.append(f"import {module} excede el presupuesto")
+
+        eager = sorted(set(LAZY_MODULES) & result["loaded"])
+        if eager:
+            print(f"❌ import {module} carga módulos que deberían ser diferidos: {', '.join(eager)}")
+            failures.append(f"import {module} carga {', '.join(eager)}")
+
+    if failures:
+        print("\n⚠️ Chequeo de arranque fallido:")
+        for f in failures:
+            print("   - " + f)
+        sys.exit(1)
+
+    print("\n✅ Arranque dentro de presupuesto.")
+
+
+if __name__ == "__main__":
+    main()
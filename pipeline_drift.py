@@ -1,7 +1,8 @@
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Any, Dict, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
+import copy
 import json
 import datetime as dt
 
@@ -9,48 +10,76 @@ import numpy as np
 import pandas as pd
 
 from funciones_drift import (
+    MULTIVARIATE_METHODS,
+    WEIGHT_COL,
+    check_backend,
     ref_decay_prefix_mass,
     ref_golden,
     ref_seasonal,
+    score_multivariate_frame,
     score_numeric_series)
 
 from drift_thresholds import DriftThresholdConfig, effective_threshold
+from drift_aggregation import check_bucket, quantile_summary, summary_range, summary_std
+from drift_outputs import (
+    AsyncOutputWriter,
+    parquet_available,
+    summarize_episodes,
+    write_episodes,
+    write_partitioned,
+)
 
 THRESHOLD_CFG = DriftThresholdConfig()
 
 
 @dataclass
 class DriftConfig:
-    method: str = "wasserstein"          # "psi", "ks" o "wasserstein"
+    method: str = "wasserstein"          # "psi", "ks", "wasserstein" o "mmd"
     strategy: str = "decay"              # "decay", "golden", "seasonal"
     window: str = "12h"                  # tamaño de ventana
     threshold: Optional[float] = None    # umbral; si None se usan defaults
     min_points: int = 60                  # mínimo de puntos por ventana
-
-
-def run_drift_univariate(series: pd.Series, cfg: DriftConfig) -> pd.DataFrame:
-    if series.empty:
-        return pd.DataFrame(
-            columns=["t0", "t1", "drift_flag", "episode_id", "stat_value", "threshold", "state"]
-        )
-
-    if not isinstance(series.index, pd.DatetimeIndex):
-        raise ValueError("run_drift_univariate espera que el índice sea DatetimeIndex.")
-
-    df = series.to_frame(name="value").sort_index()
-
+    backend: str = "auto"                # KS/Wasserstein: "auto", "scipy" o "numpy"
+    pre_aggregate: Optional[str] = None  # bucket de pre-agregación (ej "1min"); None = crudo
+    quantile_points: int = 16            # cuantiles por bucket al pre-agregar
+
+
+WINDOW_COLUMNS = ["t0", "t1", "drift_flag", "episode_id", "stat_value", "threshold", "state"]
+
+
+def _n_obs(frame: pd.DataFrame, weight_col: Optional[str] = None) -> float:
+    """Observaciones crudas representadas por `frame` (suma de `weight_col` si se indica)."""
+    if weight_col is not None:
+        return float(frame[weight_col].sum())
+    return len(frame)
+
+
+def _run_drift_windows(
+    df: pd.DataFrame,
+    cfg: DriftConfig,
+    score_fn: Callable[[pd.DataFrame, pd.DataFrame], Optional[float]],
+    ref_for_threshold: Callable[[pd.DataFrame], Any],
+    t_bounds: Optional[tuple[pd.Timestamp, pd.Timestamp]] = None,
+    weight_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Lógica común de ventanas, referencia y estado (NORMAL/DRIFT + episodios).
+
+    `df` tiene una columna por variable (una sola en el caso univariado) y,
+    solo si se indica `weight_col`, las columnas de pesos y momentos de
+    `quantile_summary` (filas pre-agregadas);
+    `score_fn(ref, cur)` calcula la métrica y `ref_for_threshold(ref)` entrega
+    lo que `effective_threshold` usa como referencia. `t_bounds` fija el rango
+    de la grilla de ventanas (por defecto, el del índice de `df`).
+    """
     w = pd.to_timedelta(cfg.window)
-    t_min, t_max = df.index.min(), df.index.max()
+    t_min, t_max = t_bounds if t_bounds is not None else (df.index.min(), df.index.max())
     if pd.isna(t_min) or pd.isna(t_max):
-        return pd.DataFrame(
-            columns=["t0", "t1", "drift_flag", "episode_id", "stat_value", "threshold", "state"]
-        )
+        return pd.DataFrame(columns=WINDOW_COLUMNS)
 
     t_ends = pd.date_range(t_min + w, t_max, freq=cfg.window)
     if len(t_ends) == 0:
-        return pd.DataFrame(
-            columns=["t0", "t1", "drift_flag", "episode_id", "stat_value", "threshold", "state"]
-        )
+        return pd.DataFrame(columns=WINDOW_COLUMNS)
 
     state = "NORMAL"
     current_episode = 0
@@ -63,7 +92,7 @@ def run_drift_univariate(series: pd.Series, cfg: DriftConfig) -> pd.DataFrame:
         df_hist = df.loc[: t0 - pd.Timedelta(microseconds=1)]
         df_cur = df.loc[t0:t_end]
 
-        if df_hist.empty or df_cur.empty or len(df_cur) < cfg.min_points:
+        if df_hist.empty or df_cur.empty or _n_obs(df_cur, weight_col) < cfg.min_points:
             rows.append(
                 {
                     "t0": t0,
@@ -81,7 +110,7 @@ def run_drift_univariate(series: pd.Series, cfg: DriftConfig) -> pd.DataFrame:
         if cfg.strategy == "decay":
             ref_global = ref_decay_prefix_mass(df_hist, now=t_end)
         elif cfg.strategy == "golden":
-            ref_global = ref_golden(df_hist)
+            ref_global = ref_golden(df_hist, exclude=[weight_col] if weight_col else ())
         elif cfg.strategy == "seasonal":
             ref_global = ref_seasonal(df_hist, current_end=t_end)
         else:
@@ -90,10 +119,10 @@ def run_drift_univariate(series: pd.Series, cfg: DriftConfig) -> pd.DataFrame:
         if ref_global is None or ref_global.empty:
             ref_global = df_hist
 
-        ref_series = ref_global["value"].dropna()
-        cur_series = df_cur["value"].dropna()
+        ref_frame = ref_global.dropna()
+        cur_frame = df_cur.dropna()
 
-        if ref_series.empty or cur_series.empty or len(cur_series) < cfg.min_points:
+        if ref_frame.empty or cur_frame.empty or _n_obs(cur_frame, weight_col) < cfg.min_points:
             rows.append(
                 {
                     "t0": t0,
@@ -107,13 +136,14 @@ def run_drift_univariate(series: pd.Series, cfg: DriftConfig) -> pd.DataFrame:
             )
             continue
 
-        stat_val = score_numeric_series(ref_series, cur_series, cfg.method)
+        stat_val = score_fn(ref_frame, cur_frame)
 
         thr = effective_threshold(
             method=cfg.method,
-            ref_series=ref_series,
+            ref_series=ref_for_threshold(ref_frame),
             cfg=THRESHOLD_CFG,
             thr_override=cfg.threshold,
+            ref_std=summary_std(ref_frame) if weight_col else None,
         )
 
         # --- Nueva lógica de estado sin histéresis ---
@@ -146,6 +176,65 @@ def run_drift_univariate(series: pd.Series, cfg: DriftConfig) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+def run_drift_univariate(series: pd.Series, cfg: DriftConfig) -> pd.DataFrame:
+    if series.empty:
+        return pd.DataFrame(columns=WINDOW_COLUMNS)
+
+    if not isinstance(series.index, pd.DatetimeIndex):
+        raise ValueError("run_drift_univariate espera que el índice sea DatetimeIndex.")
+
+    if cfg.pre_aggregate:
+        check_bucket(cfg.pre_aggregate, cfg.window)
+        # resúmenes de cuantiles ponderados por bucket (columnas value + weight)
+        df = quantile_summary(series, cfg.pre_aggregate, cfg.quantile_points)
+        weight_col: Optional[str] = WEIGHT_COL
+    else:
+        df = series.to_frame(name="value").sort_index()
+        weight_col = None
+
+    return _run_drift_windows(
+        df,
+        cfg,
+        score_fn=lambda ref, cur: score_numeric_series(
+            ref["value"],
+            cur["value"],
+            cfg.method,
+            backend=cfg.backend,
+            a_weights=ref[weight_col] if weight_col else None,
+            b_weights=cur[weight_col] if weight_col else None,
+            a_range=summary_range(ref) if weight_col else None,
+        ),
+        ref_for_threshold=lambda ref: ref["value"],
+        # misma grilla de ventanas que el camino crudo
+        t_bounds=(series.index.min(), series.index.max()),
+        weight_col=weight_col,
+    )
+
+
+def run_drift_multivariate(frame: pd.DataFrame, cfg: DriftConfig) -> pd.DataFrame:
+    """
+    Drift conjunto para un grupo de variables (una columna por variable).
+    Solo se usan filas con todas las variables del grupo presentes. Todas las
+    columnas son variables (sin pesos), aunque alguna se llame como `WEIGHT_COL`.
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=WINDOW_COLUMNS)
+
+    if not isinstance(frame.index, pd.DatetimeIndex):
+        raise ValueError("run_drift_multivariate espera que el índice sea DatetimeIndex.")
+
+    df = frame.dropna().sort_index()
+    if df.empty:
+        return pd.DataFrame(columns=WINDOW_COLUMNS)
+
+    return _run_drift_windows(
+        df,
+        cfg,
+        score_fn=lambda ref, cur: score_multivariate_frame(ref, cur, cfg.method),
+        ref_for_threshold=lambda ref: ref,
+    )
+
+
 def windows_to_point_flags(windows_df: pd.DataFrame, index: pd.DatetimeIndex) -> pd.Series:
     flags = pd.Series(False, index=index)
 
@@ -161,6 +250,121 @@ def windows_to_point_flags(windows_df: pd.DataFrame, index: pd.DatetimeIndex) ->
     return flags
 
 
+# ============================================================
+#  Config y datos de entrada (usados por DriftPipeline y scripts auxiliares)
+# ============================================================
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "global": {
+        "method": "wasserstein",
+        "strategy": "decay",
+        "window": "12h",
+        "threshold": None,
+        "min_points": 60,
+        "backend": "auto",
+        "pre_aggregate": None,
+        "quantile_points": 16,
+    }
+}
+
+
+def load_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Lee el JSON de configuración; sin ruta, usa DEFAULT_CONFIG."""
+    if config_path is None:
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    config_path = Path(config_path)
+    if not config_path.exists():
+        raise FileNotFoundError(
+            f"No se encontró el archivo de configuración: {config_path}"
+        )
+
+    with config_path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("El archivo de configuración debe contener un objeto JSON.")
+    return data
+
+
+def merge_config(
+    config: Dict[str, Any],
+    overrides: Dict[str, Any],
+    default_method: Optional[str] = None,
+) -> DriftConfig:
+    """Bloque `global` de `config` + `overrides`, validado, como DriftConfig."""
+    global_cfg: Dict[str, Any] = config.get("global", {})
+
+    merged: Dict[str, Any] = {
+        "method": default_method or global_cfg.get("method", "wasserstein"),
+        "strategy": global_cfg.get("strategy", "decay"),
+        "window": str(global_cfg.get("window", "12h")).lower(),
+        "threshold": global_cfg.get("threshold", None),
+        "min_points": int(global_cfg.get("min_points", 60)),
+        "backend": str(global_cfg.get("backend", "auto")).lower(),
+        "pre_aggregate": global_cfg.get("pre_aggregate", None),
+        "quantile_points": int(global_cfg.get("quantile_points", 16)),
+    }
+
+    for k, v in overrides.items():
+        if k in ("window", "backend"):
+            merged[k] = str(v).lower()
+        elif k in ("min_points", "quantile_points"):
+            merged[k] = int(v)
+        else:
+            merged[k] = v
+
+    check_backend(merged["backend"])
+
+    if merged["pre_aggregate"] is not None:
+        merged["pre_aggregate"] = str(merged["pre_aggregate"]).lower()
+        check_bucket(merged["pre_aggregate"], merged["window"])
+
+    return DriftConfig(**merged)
+
+
+def build_var_config(config: Dict[str, Any], var_name: str) -> DriftConfig:
+    """Config efectiva de una variable: `global` + `variables.<var_name>`."""
+    var_overrides: Dict[str, Any] = config.get("variables", {}).get(var_name, {})
+    return merge_config(config, var_overrides)
+
+
+def read_input_csv(input_csv: Path) -> pd.DataFrame:
+    """Lee el CSV de entrada, indexado y ordenado por `date_time`."""
+    df_raw = pd.read_csv(input_csv)
+
+    if "date_time" not in df_raw.columns:
+        raise ValueError("El CSV de entrada debe tener una columna 'date_time'.")
+
+    df_raw["date_time"] = pd.to_datetime(df_raw["date_time"], errors="coerce")
+    return (
+        df_raw.dropna(subset=["date_time"])
+        .sort_values("date_time")
+        .set_index("date_time")
+    )
+
+
+def select_variables(
+    df_raw: pd.DataFrame,
+    requested: Optional[Sequence[str]] = None,
+) -> tuple[List[str], List[str]]:
+    """
+    Retorna (columnas numéricas, variables a procesar). Si `requested` es
+    None se procesan todas las columnas numéricas.
+    """
+    numeric_cols = df_raw.select_dtypes(include="number").columns.tolist()
+    if not numeric_cols:
+        raise ValueError("No se encontraron columnas numéricas en el CSV de entrada.")
+
+    if requested is not None:
+        variables = [c for c in requested if c in numeric_cols]
+    else:
+        variables = numeric_cols
+
+    if not variables:
+        raise ValueError("No hay variables válidas para procesar drift.")
+    return numeric_cols, variables
+
+
 class DriftPipeline:
     def __init__(
         self,
@@ -168,65 +372,75 @@ class DriftPipeline:
         output_root: Path,
         config_path: Optional[Path] = None,
         variables: Optional[Sequence[str]] = None,
+        results_store: bool = False,
     ) -> None:
         self.input_csv = Path(input_csv)
         self.output_root = Path(output_root)
         self.config_path = Path(config_path) if config_path is not None else None
         self.variables = list(variables) if variables is not None else None
+        self.results_store = results_store
 
         self._config: Optional[Dict[str, Any]] = None
 
     # Config Helpers
 
     def _load_config(self) -> Dict[str, Any]:
-        if self.config_path is None:
-            return {
-                "global": {
-                    "method": "wasserstein",
-                    "strategy": "decay",
-                    "window": "12h",
-                    "threshold": None,
-                    "min_points": 60,
-                }
-            }
-
-        if not self.config_path.exists():
-            raise FileNotFoundError(
-                f"No se encontró el archivo de configuración: {self.config_path}"
-            )
+        return load_config(self.config_path)
 
-        with self.config_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, dict):
-            raise ValueError("El archivo de configuración debe contener un objeto JSON.")
-        return data
+    def _merge_cfg(self, overrides: Dict[str, Any], default_method: Optional[str] = None) -> DriftConfig:
+        if self._config is None:
+            self._config = self._load_config()
+        return merge_config(self._config, overrides, default_method=default_method)
 
     def _build_cfg_for_var(self, var_name: str) -> DriftConfig:
         if self._config is None:
             self._config = self._load_config()
+        return build_var_config(self._config, var_name)
 
-        global_cfg: Dict[str, Any] = self._config.get("global", {})
-        var_overrides: Dict[str, Any] = (
-            self._config.get("variables", {}).get(var_name, {})
-        )
+    def _build_cfg_for_group(
+        self,
+        group_name: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> tuple[List[str], DriftConfig]:
+        """
+        Config de un grupo multivariado (`groups.<nombre>` en el JSON).
+        El método por defecto de un grupo es 'mmd', no el método global, y el
+        `threshold` global solo se hereda si el grupo usa ese mismo método.
+        La pre-agregación no aplica a grupos (resume cada variable por separado).
+        Si se entregan `columns`, el nombre del grupo no puede coincidir con una.
+        """
+        if self._config is None:
+            self._config = self._load_config()
 
-        merged: Dict[str, Any] = {
-            "method": global_cfg.get("method", "wasserstein"),
-            "strategy": global_cfg.get("strategy", "decay"),
-            "window": str(global_cfg.get("window", "12h")).lower(),
-            "threshold": global_cfg.get("threshold", None),
-            "min_points": int(global_cfg.get("min_points", 60)),
-        }
+        group_def: Dict[str, Any] = dict(self._config.get("groups", {}).get(group_name, {}))
+        group_vars = group_def.pop("variables", None)
+        if not group_vars or not isinstance(group_vars, list):
+            raise ValueError(
+                f"El grupo {group_name!r} debe definir una lista 'variables' no vacía."
+            )
 
-        for k, v in var_overrides.items():
-            if k == "window":
-                merged[k] = str(v).lower()
-            elif k in ("min_points"):
-                merged[k] = int(v)
-            else:
-                merged[k] = v
+        if columns is not None and group_name in columns:
+            raise ValueError(
+                f"El nombre del grupo {group_name!r} coincide con una columna del CSV."
+            )
+
+        method = str(group_def.get("method", "mmd")).lower()
+        if method not in MULTIVARIATE_METHODS:
+            raise ValueError(
+                f"El grupo {group_name!r} usa el método {method!r}, que no es multivariado "
+                f"(soportados: {', '.join(MULTIVARIATE_METHODS)})."
+            )
 
-        return DriftConfig(**merged)
+        # la pre-agregación no aplica a grupos
+        group_def["pre_aggregate"] = None
+
+        global_method = str(self._config.get("global", {}).get("method", "wasserstein")).lower()
+        if "threshold" not in group_def and method != global_method:
+            # un umbral global pensado para otra métrica no aplica a este grupo
+            group_def["threshold"] = None
+
+        cfg = self._merge_cfg(group_def, default_method="mmd")
+        return [str(v) for v in group_vars], cfg
 
     # Main Execution
     def run(self) -> None:
@@ -235,73 +449,115 @@ class DriftPipeline:
         self.output_root.mkdir(parents=True, exist_ok=True)
         ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
         run_dir = self.output_root / f"{self.input_csv.stem}_{ts}"
-        run_dir.mkdir(parents=True, exist_ok=True)
 
         self._config = self._load_config()
 
         print(f"Leyendo datos desde: {self.input_csv}")
-        df_raw = pd.read_csv(self.input_csv)
-
-        if "date_time" not in df_raw.columns:
-            raise ValueError("El CSV de entrada debe tener una columna 'date_time'.")
-
-        df_raw["date_time"] = pd.to_datetime(df_raw["date_time"], errors="coerce")
-        df_raw = (
-            df_raw.dropna(subset=["date_time"])
-            .sort_values("date_time")
-            .set_index("date_time")
-        )
+        df_raw = read_input_csv(self.input_csv)
 
         # Variables numéricas
-        numeric_cols = df_raw.select_dtypes(include="number").columns.tolist()
-        if not numeric_cols:
-            raise ValueError("No se encontraron columnas numéricas en el CSV de entrada.")
-
-        if self.variables is not None:
-            variables = [c for c in self.variables if c in numeric_cols]
-        else:
-            variables = numeric_cols
-
-        if not variables:
-            raise ValueError("No hay variables válidas para procesar drift.")
+        numeric_cols, variables = select_variables(df_raw, self.variables)
 
         print("Variables a procesar:", ", ".join(variables))
         print(f"Directorio de salida: {run_dir}")
 
-        effective_var_cfg: Dict[str, Any] = {}
-
-        for var in variables:
-            print(f"\nProcesando variable: {var}")
-            series = df_raw[var].dropna()
-
-            cfg = self._build_cfg_for_var(var)
-            effective_var_cfg[var] = asdict(cfg)
-
-            win_results = run_drift_univariate(series, cfg)
-
-            win_dir = run_dir / "Windows"
-            win_dir.mkdir(parents=True, exist_ok=True)
-            win_csv_path = win_dir / f"{var}_windows.csv"
-            win_results.to_csv(win_csv_path, index=False)
-
-            drift_flags = windows_to_point_flags(win_results, df_raw.index)
-
-            out_df = pd.DataFrame(
-                {
-                    "date_time": df_raw.index,
-                    "value": df_raw[var].values,
-                    "has_drift": drift_flags.reindex(df_raw.index, fill_value=False)
-                    .astype(bool)
-                    .values,
-                }
-            )
-
-            flags_dir = run_dir / "Flags"
-            flags_dir.mkdir(parents=True, exist_ok=True)
-            out_csv_path = flags_dir / f"{var}.csv"
-            out_df.to_csv(out_csv_path, index=False)
-            print(f"  → Guardado: {out_csv_path.name}")
+        store_dir: Optional[Path] = None
+        if self.results_store:
+            if parquet_available():
+                store_dir = run_dir / "Store"
+            else:
+                print(
+                    "\n⚠️ pyarrow no está instalado: se omite el store Parquet "
+                    "(pip install pyarrow)."
+                )
+
+        # Validamos la config de todas las variables y grupos antes de procesar,
+        # para no dejar una corrida a medias por un error de configuración.
+        var_cfgs = {var: self._build_cfg_for_var(var) for var in variables}
+        group_cfgs = {
+            group: self._build_cfg_for_group(group, numeric_cols)
+            for group in self._config.get("groups", {})
+        }
+        run_dir.mkdir(parents=True, exist_ok=True)
 
+        effective_var_cfg: Dict[str, Any] = {}
+        effective_group_cfg: Dict[str, Any] = {}
+        episodes: List[pd.DataFrame] = []
+
+        # Los CSV se escriben en un hilo aparte, solapados con el cálculo de la
+        # siguiente variable; al salir del bloque se espera a que terminen.
+        # El store Parquet se escribe en el hilo principal (pyarrow no se usa
+        # desde el hilo de escritura).
+        with AsyncOutputWriter() as writer:
+            for var in variables:
+                print(f"\nProcesando variable: {var}")
+                series = df_raw[var].dropna()
+
+                cfg = var_cfgs[var]
+                effective_var_cfg[var] = asdict(cfg)
+
+                win_results = run_drift_univariate(series, cfg)
+
+                win_dir = run_dir / "Windows"
+                win_dir.mkdir(parents=True, exist_ok=True)
+                win_csv_path = win_dir / f"{var}_windows.csv"
+                writer.submit(win_results.to_csv, win_csv_path, index=False)
+
+                drift_flags = windows_to_point_flags(win_results, df_raw.index)
+
+                out_df = pd.DataFrame(
+                    {
+                        "date_time": df_raw.index,
+                        "value": df_raw[var].values,
+                        "has_drift": drift_flags.reindex(df_raw.index, fill_value=False)
+                        .astype(bool)
+                        .values,
+                    }
+                )
+
+                flags_dir = run_dir / "Flags"
+                flags_dir.mkdir(parents=True, exist_ok=True)
+                out_csv_path = flags_dir / f"{var}.csv"
+                writer.submit(out_df.to_csv, out_csv_path, index=False)
+                print(f"  → Escribiendo: {out_csv_path.name}")
+
+                if store_dir is not None:
+                    write_partitioned(win_results, store_dir / "windows", var, "t0")
+                    write_partitioned(out_df, store_dir / "flags", var, "date_time")
+                    episodes.append(summarize_episodes(win_results, var))
+
+            for group, (group_vars, cfg) in group_cfgs.items():
+
+                missing = [v for v in group_vars if v not in variables]
+                if missing:
+                    print(
+                        f"\n⚠️ Grupo {group!r} omitido: faltan variables "
+                        f"({', '.join(missing)})."
+                    )
+                    continue
+
+                print(f"\nProcesando grupo multivariado: {group} ({', '.join(group_vars)})")
+                effective_group_cfg[group] = {"variables": group_vars, **asdict(cfg)}
+
+                win_results = run_drift_multivariate(df_raw[group_vars], cfg)
+
+                win_dir = run_dir / "Windows"
+                win_dir.mkdir(parents=True, exist_ok=True)
+                win_csv_path = win_dir / f"{group}_windows.csv"
+                writer.submit(win_results.to_csv, win_csv_path, index=False)
+                print(f"  → Escribiendo: {win_csv_path.name}")
+
+                if store_dir is not None:
+                    write_partitioned(win_results, store_dir / "windows", group, "t0")
+                    episodes.append(summarize_episodes(win_results, group))
+
+            if store_dir is not None:
+                write_episodes(episodes, store_dir / "episodes.parquet")
+
+        print(
+            f"\n💾 Escritura CSV: {writer.busy_seconds:.2f} s en el hilo de escritura, "
+            f"{writer.wait_seconds:.2f} s con el cálculo bloqueado esperándolo."
+        )
 
         run_config_effective = {
             "input_csv": str(self.input_csv),
@@ -309,11 +565,14 @@ class DriftPipeline:
             "generated_at": dt.datetime.now().isoformat(),
             "global": self._config.get("global", {}),
             "variables": effective_var_cfg,
+            "groups": effective_group_cfg,
         }
 
         run_config_path = run_dir / "config_used.json"
         with run_config_path.open("w", encoding="utf-8") as f:
             json.dump(run_config_effective, f, indent=2, ensure_ascii=False)
+        if store_dir is not None:
+            print(f"🗂️ Store Parquet consolidado en: {store_dir}")
         print(f"\n📝 Configuración efectiva de la corrida guardada en: {run_config_path}")
 
         print("\n✅ Pipeline de drift terminado.")
@@ -0,0 +1,138 @@
+import argparse
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from drift_aggregation import quantile_summary
+from pipeline_drift import (
+    build_var_config,
+    load_config,
+    read_input_csv,
+    run_drift_univariate,
+    select_variables,
+)
+
+
+# ============================================================
+# Reporte de precisión: pre-agregación vs camino crudo
+# ============================================================
+
+def compare_variable(series: pd.Series, cfg, bucket: str, quantile_points: int) -> dict:
+    """
+    Corre `run_drift_univariate` sobre la serie cruda y sobre su versión
+    pre-agregada, y compara métrica y flags ventana a ventana.
+    """
+    cfg_raw = replace(cfg, pre_aggregate=None)
+    cfg_agg = replace(cfg, pre_aggregate=bucket, quantile_points=quantile_points)
+
+    t = time.perf_counter()
+    win_raw = run_drift_univariate(series, cfg_raw)
+    t_raw = time.perf_counter() - t
+
+    t = time.perf_counter()
+    win_agg = run_drift_univariate(series, cfg_agg)
+    t_agg = time.perf_counter() - t
+
+    merged = win_raw.merge(win_agg, on=["t0", "t1"], how="inner", suffixes=("_raw", "_agg"))
+    stat_raw = pd.to_numeric(merged["stat_value_raw"], errors="coerce")
+    stat_agg = pd.to_numeric(merged["stat_value_agg"], errors="coerce")
+    both = stat_raw.notna() & stat_agg.notna()
+    abs_err = (stat_raw[both] - stat_agg[both]).abs()
+    rel_err = abs_err / stat_raw[both].abs().replace(0, np.nan)
+
+    thr_raw = pd.to_numeric(merged["threshold_raw"], errors="coerce")
+    thr_agg = pd.to_numeric(merged["threshold_agg"], errors="coerce")
+    thr_rel_err = ((thr_agg - thr_raw).abs() / thr_raw.abs().replace(0, np.nan)).dropna()
+
+    flags_raw = merged["drift_flag_raw"].astype(bool)
+    flags_agg = merged["drift_flag_agg"].astype(bool)
+
+    return {
+        "method": cfg.method,
+        "n_raw": int(series.notna().sum()),
+        "n_summary": len(quantile_summary(series, bucket, quantile_points)),
+        "windows": len(merged),
+        "windows_evaluated_raw": int(stat_raw.notna().sum()),
+        "windows_evaluated_agg": int(stat_agg.notna().sum()),
+        "stat_mae": float(abs_err.mean()) if len(abs_err) else np.nan,
+        "stat_max_abs_err": float(abs_err.max()) if len(abs_err) else np.nan,
+        "stat_median_rel_err": float(rel_err.median()) if rel_err.notna().any() else np.nan,
+        "threshold_max_rel_err": float(thr_rel_err.max()) if len(thr_rel_err) else np.nan,
+        "flag_agreement": float((flags_raw == flags_agg).mean()) if len(merged) else np.nan,
+        "flags_raw": int(flags_raw.sum()),
+        "flags_agg": int(flags_agg.sum()),
+        "seconds_raw": round(t_raw, 3),
+        "seconds_agg": round(t_agg, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compara la detección de drift con y sin pre-agregación "
+            "(resúmenes de cuantiles por bucket) para cada variable."
+        )
+    )
+    parser.add_argument("input_csv", type=str, help="CSV de entrada (con columna 'date_time').")
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="Config JSON de drift (por defecto: defaults del pipeline).",
+    )
+    parser.add_argument("--columns", nargs="+", default=None, help="Columnas a evaluar.")
+    parser.add_argument(
+        "--bucket",
+        type=str,
+        default="1min",
+        help="Tamaño de bucket de la pre-agregación (por defecto: 1min).",
+    )
+    parser.add_argument(
+        "--quantile-points",
+        type=int,
+        default=16,
+        help="Cuantiles por bucket (por defecto: 16).",
+    )
+    parser.add_argument(
+        "--methods",
+        nargs="+",
+        default=None,
+        choices=["psi", "ks", "wasserstein", "mmd"],
+        help="Métodos a comparar. Si no se indica, se usa el de la config.",
+    )
+    parser.add_argument("--output", type=str, default=None, help="CSV donde guardar el reporte.")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    df_raw = read_input_csv(args.input_csv)
+    _, variables = select_variables(df_raw, args.columns)
+
+    rows = []
+    for var in variables:
+        cfg = build_var_config(config, var)
+        for method in args.methods or [cfg.method]:
+            print(f"Comparando {var} ({method})...")
+            result = compare_variable(
+                df_raw[var].dropna(),
+                replace(cfg, method=method),
+                args.bucket,
+                args.quantile_points,
+            )
+            rows.append({"variable": var, **result})
+
+    report = pd.DataFrame(rows)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print("\n" + report.to_string(index=False))
+
+    if args.output:
+        out_path = Path(args.output)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        report.to_csv(out_path, index=False)
+        print(f"\n📝 Reporte guardado en: {out_path}")
+
+
+if __name__ == "__main__":
+    main()